@@ -1,15 +1,22 @@
 import sys
+import asyncio
+import copy
+import itertools
 import os
 import logging
 import time
-from typing import Optional, List, Dict, Any
+from collections import OrderedDict
+from contextlib import asynccontextmanager, nullcontext
+from typing import Optional, List, Dict, Any, AsyncIterator, Union
 from uuid import uuid4
 
 from dotenv import load_dotenv
 load_dotenv()
 
+import orjson
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
 from agents import (
@@ -41,6 +48,14 @@ from main import (
     load_customer_context,
     load_user_context,
     AirlineAgentContext,
+    DISPLAY_SEAT_MAP,
+    DISPLAY_BUSINESS_FORM,
+    match_triage_shortcut,
+    answer_attendance_query,
+    JAILBREAK_PATTERNS,
+    JAILBREAK_HINTS,
+    model_provider,
+    RUN_CONFIG,
 )
 
 from database import db_client
@@ -48,14 +63,23 @@ from database import db_client
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    conversation_store.start()
+    yield
+    await conversation_store.stop()
+    await db_client.close()
+    await model_provider.close()
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://localhost:3001"],
     allow_credentials=True,
-    allow_methods=["*"],
+    allow_methods=["GET", "POST", "OPTIONS"],
     allow_headers=["*"],
+    max_age=86400,
 )
 
 class ChatRequest(BaseModel):
@@ -82,6 +106,8 @@ class GuardrailCheck(BaseModel):
     reasoning: str
     passed: bool
     timestamp: float
+    # False when the guardrail did not run this turn (the reply needed no model call).
+    evaluated: bool = True
 
 class CustomerDetails(BaseModel):
     name: Optional[str] = None
@@ -110,6 +136,29 @@ class ChatResponse(BaseModel):
     guardrails: List[GuardrailCheck] = []
     customer_info: Optional[CustomerInfoResponse] = None
 
+def snapshot_context_fields(context: BaseModel) -> Dict[str, Any]:
+    """Context field values to diff against at the end of a turn.
+
+    Lists and dicts (customer_bookings, user_details) are deep-copied, so an in-place edit still
+    shows up as a change, bumps `_ctx_version` and invalidates the dump below.
+    """
+    return {k: copy.deepcopy(v) if isinstance(v, (list, dict)) else v for k, v in context.__dict__.items()}
+
+def dump_context(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Dump the context, reusing the previous dump while `_ctx_version` is unchanged.
+
+    The version only moves when the per-turn diff against snapshot_context_fields finds a change.
+    """
+    context = state["context"]
+    if not isinstance(context, BaseModel):
+        return context
+    version = state.get("_ctx_version", 0)
+    if state.get("_ctx_saved_version") == version:
+        return state["_ctx_dump"]
+    state["_ctx_dump"] = context.model_dump()
+    state["_ctx_saved_version"] = version
+    return state["_ctx_dump"]
+
 class ConversationStore:
     async def get(self, conversation_id: str) -> Optional[Dict[str, Any]]:
         raise NotImplementedError
@@ -118,29 +167,59 @@ class ConversationStore:
         raise NotImplementedError
 
 class SupabaseConversationStore(ConversationStore):
-    def __init__(self):
-        self._memory_cache: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, max_cached: Optional[int] = None):
+        self._memory_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._max_cached = max_cached or int(os.getenv("CONV_CACHE_SIZE", "10000"))
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._lock_refs: Dict[str, int] = {}
+        # Pending snapshots (see _snapshot), not live states: a flush never sees a turn in progress.
+        self._dirty: Dict[str, Dict[str, Any]] = {}
+        self._flush_interval = float(os.getenv("CONV_FLUSH_INTERVAL", "0.25"))
+        self._flusher_task: Optional[asyncio.Task] = None
+
+    @asynccontextmanager
+    async def acquire(self, conversation_id: str):
+        """Serialize turns for one conversation so concurrent requests don't race on load/save."""
+        # No await between lookup and refcount update, so this is safe on a single event loop.
+        lock = self._locks.get(conversation_id)
+        if lock is None:
+            lock = self._locks[conversation_id] = asyncio.Lock()
+        self._lock_refs[conversation_id] = self._lock_refs.get(conversation_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._lock_refs[conversation_id] -= 1
+            if self._lock_refs[conversation_id] == 0:
+                del self._lock_refs[conversation_id]
+                del self._locks[conversation_id]
+
+    def _cache_put(self, conversation_id: str, state: Dict[str, Any]):
+        self._memory_cache[conversation_id] = state
+        self._memory_cache.move_to_end(conversation_id)
+        while len(self._memory_cache) > self._max_cached:
+            evicted_id, _ = self._memory_cache.popitem(last=False)
+            logger.debug(f"Evicted conversation {evicted_id} from memory cache.")
 
     async def get(self, conversation_id: str) -> Optional[Dict[str, Any]]:
-        if conversation_id in self._memory_cache:
+        state = self._memory_cache.get(conversation_id)
+        if state is None and conversation_id in self._dirty:
+            state = self._state_from_saved(self._dirty[conversation_id])
+            self._cache_put(conversation_id, state)
+        if state is not None:
+            self._memory_cache.move_to_end(conversation_id)
+            self.cache_hits += 1
             logger.debug(f"Loaded conversation {conversation_id} from memory cache.")
-            return self._memory_cache[conversation_id]
+            return state
+        self.cache_misses += 1
         
         try:
             conversation_data = await db_client.load_conversation(conversation_id)
             if conversation_data:
-                context_data = conversation_data.get("context", {})
-                if isinstance(context_data, dict):
-                    context_instance = AirlineAgentContext(**context_data)
-                else:
-                    context_instance = create_initial_context()
-
-                state = {
-                    "input_items": conversation_data.get("history", []),
-                    "context": context_instance,
-                    "current_agent": conversation_data.get("current_agent", triage_agent.name),
-                }
-                self._memory_cache[conversation_id] = state
+                state = self._state_from_saved(conversation_data)
+                self._cache_put(conversation_id, state)
                 logger.debug(f"Loaded conversation {conversation_id} from database.")
                 return state
         except Exception as e:
@@ -148,36 +227,105 @@ class SupabaseConversationStore(ConversationStore):
         
         return None
 
+    @staticmethod
+    def _state_from_saved(saved: Dict[str, Any]) -> Dict[str, Any]:
+        """Rebuild a live state from a persisted (or pending) snapshot."""
+        context_data = saved.get("context", {})
+        if isinstance(context_data, dict):
+            context_instance = AirlineAgentContext(**context_data)
+        else:
+            context_instance = create_initial_context()
+        return {
+            "input_items": list(saved.get("history", [])),
+            "context": context_instance,
+            "current_agent": saved.get("current_agent", triage_agent.name),
+        }
+
+    @staticmethod
+    def _snapshot(state: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy what gets persisted, so later turns can keep mutating the live state.
+
+        The history is copied shallowly: turns only append items, never edit them. The context dump
+        is replaced rather than mutated when the context changes (see dump_context).
+        """
+        return {
+            "history": list(state.get("input_items", [])),
+            "context": dump_context(state),
+            "current_agent": state.get("current_agent", triage_agent.name),
+        }
+
     async def save(self, conversation_id: str, state: Dict[str, Any]):
-        self._memory_cache[conversation_id] = state
+        self._cache_put(conversation_id, state)
+        snapshot = self._snapshot(state)
+        if self._flusher_task is None:
+            await self._persist(conversation_id, snapshot)
+            return
+        # Write-behind: the flusher coalesces consecutive turns into one database write.
+        self._dirty[conversation_id] = snapshot
+
+    async def _persist(self, conversation_id: str, snapshot: Dict[str, Any]) -> bool:
         try:
-            context_to_save = state["context"].model_dump() if isinstance(state["context"], BaseModel) else state["context"]
             success = await db_client.save_conversation(
                 session_id=conversation_id,
-                history=state.get("input_items", []),
-                context=context_to_save,
-                current_agent=state.get("current_agent", triage_agent.name)
+                history=snapshot["history"],
+                context=snapshot["context"],
+                current_agent=snapshot["current_agent"],
             )
             if not success:
                 logger.warning(f"Failed to save conversation {conversation_id} to database.")
             else:
                 logger.debug(f"Saved conversation {conversation_id} to database.")
+            return success
         except Exception as e:
             logger.error(f"Error saving conversation {conversation_id} to database: {e}", exc_info=True)
+            return False
+
+    async def flush(self):
+        """Write every pending conversation to the database."""
+        if not self._dirty:
+            return
+        pending, self._dirty = self._dirty, {}
+        results = await asyncio.gather(*(self._persist(cid, snapshot) for cid, snapshot in pending.items()))
+        # Failed writes go back in the queue for the next flush, unless a newer turn already replaced them.
+        for (cid, snapshot), saved in zip(pending.items(), results):
+            if not saved:
+                self._dirty.setdefault(cid, snapshot)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            await self.flush()
+
+    def start(self):
+        if self._flusher_task is None:
+            self._flusher_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._flusher_task is not None:
+            self._flusher_task.cancel()
+            try:
+                await self._flusher_task
+            except asyncio.CancelledError:
+                pass
+            self._flusher_task = None
+        await self.flush()
 
 conversation_store = SupabaseConversationStore()
 
+ALL_AGENTS = (
+    triage_agent,
+    seat_booking_agent,
+    flight_status_agent,
+    cancellation_agent,
+    faq_agent,
+    schedule_agent,
+    networking_agent,
+)
+
+AGENTS_BY_NAME: Dict[str, Any] = {agent.name: agent for agent in ALL_AGENTS}
+
 def get_agent_by_name(name: str):
-    agents = {
-        triage_agent.name: triage_agent,
-        seat_booking_agent.name: seat_booking_agent,
-        flight_status_agent.name: flight_status_agent,
-        cancellation_agent.name: cancellation_agent,
-        faq_agent.name: faq_agent,
-        schedule_agent.name: schedule_agent,
-        networking_agent.name: networking_agent,
-    }
-    return agents.get(name, triage_agent)
+    return AGENTS_BY_NAME.get(name, triage_agent)
 
 def get_guardrail_name(g) -> str:
     name_attr = getattr(g, "name", None)
@@ -191,27 +339,35 @@ def get_guardrail_name(g) -> str:
         return fn_name.replace("_", " ").title()
     return str(g)
 
-def build_agents_list() -> List[Dict[str, Any]]:
-    all_agents = [
-        triage_agent,
-        seat_booking_agent,
-        flight_status_agent,
-        cancellation_agent,
-        faq_agent,
-        schedule_agent,
-        networking_agent,
-    ]
+# Guardrails are static per agent, so their display names are resolved once.
+GUARDRAIL_NAMES_BY_AGENT: Dict[str, List[str]] = {
+    agent.name: [get_guardrail_name(g) for g in getattr(agent, "input_guardrails", [])]
+    for agent in ALL_AGENTS
+}
+
+def get_guardrail_names(agent_name: str) -> List[str]:
+    return GUARDRAIL_NAMES_BY_AGENT.get(agent_name, GUARDRAIL_NAMES_BY_AGENT[triage_agent.name])
+
+def get_handoff_target_name(h) -> str:
+    if hasattr(h, 'agent') and hasattr(h.agent, 'name'):
+        return h.agent.name
+    elif hasattr(h, 'agent_name'):
+        return h.agent_name
+    return str(h)
+
+# (source agent name, target agent name) -> (handoff, hook name or None), resolved once.
+HANDOFFS_BY_ROUTE: Dict[tuple, tuple] = {}
+for _agent in ALL_AGENTS:
+    for _h in getattr(_agent, "handoffs", []):
+        _hook = getattr(_h, "on_handoff", None)
+        _hook_name = getattr(_hook, "__name__", repr(_hook)) if _hook else None
+        HANDOFFS_BY_ROUTE.setdefault((_agent.name, get_handoff_target_name(_h)), (_h, _hook_name))
+
+def _compute_agents_list() -> List[Dict[str, Any]]:
     def make_agent_dict(agent):
-        handoff_names = []
-        for h in getattr(agent, "handoffs", []):
-            if hasattr(h, 'agent') and hasattr(h.agent, 'name'):
-                handoff_names.append(h.agent.name)
-            elif hasattr(h, 'agent_name'):
-                handoff_names.append(h.agent_name)
-            else:
-                handoff_names.append(str(h))
+        handoff_names = [get_handoff_target_name(h) for h in getattr(agent, "handoffs", [])]
         tool_names = [getattr(t, "name_override", getattr(t, "__name__", str(t))) for t in getattr(agent, "tools", [])]
-        input_guardrail_names = [get_guardrail_name(g) for g in getattr(agent, "input_guardrails", [])]
+        input_guardrail_names = list(GUARDRAIL_NAMES_BY_AGENT[agent.name])
         return {
             "name": agent.name,
             "description": getattr(agent, "handoff_description", getattr(agent, "description", "")),
@@ -219,7 +375,205 @@ def build_agents_list() -> List[Dict[str, Any]]:
             "tools": tool_names,
             "input_guardrails": input_guardrail_names,
         }
-    return [make_agent_dict(agent) for agent in all_agents]
+    return [make_agent_dict(agent) for agent in ALL_AGENTS]
+
+# Agent wiring is static once main.py has been imported, so the list is built once.
+_AGENTS_LIST: List[Dict[str, Any]] = _compute_agents_list()
+
+def build_agents_list() -> List[Dict[str, Any]]:
+    return _AGENTS_LIST
+
+USER_CONTEXT_TTL = float(os.getenv("USER_CONTEXT_TTL", "60"))
+USER_CONTEXT_CACHE_SIZE = int(os.getenv("USER_CONTEXT_CACHE_SIZE", "10000"))
+_user_context_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+async def cached_load_user_context(registration_id: str) -> AirlineAgentContext:
+    """load_user_context behind a short TTL cache; every caller gets its own deep copy to mutate.
+
+    The cached context is built from the users row alone, which the app never writes (businesses and
+    bookings live in their own tables), so entries only expire by TTL.
+    """
+    now = time.monotonic()
+    entry = _user_context_cache.get(registration_id)
+    if entry and entry[0] > now:
+        logger.debug(f"Loaded user context for registration_id {registration_id} from cache.")
+        return entry[1].model_copy(deep=True)
+    ctx = await load_user_context(registration_id)
+    if ctx.user_id:
+        _user_context_cache[registration_id] = (now + USER_CONTEXT_TTL, ctx)
+        _user_context_cache.move_to_end(registration_id)
+        while len(_user_context_cache) > USER_CONTEXT_CACHE_SIZE:
+            _user_context_cache.popitem(last=False)
+    else:
+        _user_context_cache.pop(registration_id, None)
+    return ctx.model_copy(deep=True)
+
+# Exact-match reply cache for agents whose answers depend only on the question (the FAQ agent
+# answers from static policy text). A repeated question skips the model run entirely. The key has
+# no history in it, so only the opening message of a conversation is looked up or stored: a
+# follow-up like "tell me more" depends on turns another user never had.
+REPLY_CACHE_AGENTS = {faq_agent.name}
+REPLY_CACHE_TTL = float(os.getenv("REPLY_CACHE_TTL", "600"))
+REPLY_CACHE_SIZE = int(os.getenv("REPLY_CACHE_SIZE", "1000"))
+_reply_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+DIRECT_REPLY_LABELS = {"template": "templated reply", "cache": "cached reply"}
+
+def reply_cache_key(agent_name: str, message: str) -> tuple:
+    return (agent_name, " ".join(message.lower().split()))
+
+def get_cached_reply(agent_name: str, message: str) -> Optional[str]:
+    if agent_name not in REPLY_CACHE_AGENTS:
+        return None
+    key = reply_cache_key(agent_name, message)
+    entry = _reply_cache.get(key)
+    if entry is None:
+        return None
+    if entry[0] <= time.monotonic():
+        del _reply_cache[key]
+        return None
+    _reply_cache.move_to_end(key)
+    return entry[1]
+
+def cache_reply(agent_name: str, message: str, reply: str) -> None:
+    key = reply_cache_key(agent_name, message)
+    _reply_cache[key] = (time.monotonic() + REPLY_CACHE_TTL, reply)
+    _reply_cache.move_to_end(key)
+    while len(_reply_cache) > REPLY_CACHE_SIZE:
+        _reply_cache.popitem(last=False)
+
+def build_booking_details(state: Dict[str, Any]) -> List[BookingDetails]:
+    """BookingDetails models for the context's bookings, rebuilt only when the bookings list is replaced."""
+    bookings = state["context"].customer_bookings
+    if not bookings:
+        return []
+    cached = state.get("_bookings_models")
+    if cached and cached[0] is bookings and cached[1] == len(bookings):
+        return cached[2]
+    models = [BookingDetails(**b) for b in bookings]
+    state["_bookings_models"] = (bookings, len(bookings), models)
+    return models
+
+def build_customer_info(state: Dict[str, Any]) -> Optional[CustomerInfoResponse]:
+    """Build the customer panel payload, reusing the previous turn's result when nothing changed."""
+    ctx = state["context"]
+    if not ctx.registration_id:
+        return None
+    bookings = ctx.customer_bookings
+    cache_key = (
+        ctx.registration_id,
+        ctx.passenger_name,
+        ctx.account_number,
+        ctx.customer_email,
+        ctx.is_conference_attendee,
+        ctx.conference_name,
+        id(bookings),
+        len(bookings) if bookings else 0,
+    )
+    cached = state.get("_cached_customer_info")
+    if cached and cached[0] == cache_key:
+        return cached[1]
+    customer_info = CustomerInfoResponse(
+        customer=CustomerDetails(
+            name=ctx.passenger_name,
+            account_number=ctx.account_number,
+            email=ctx.customer_email,
+            is_conference_attendee=ctx.is_conference_attendee,
+            conference_name=ctx.conference_name,
+            registration_id=ctx.registration_id,
+        ),
+        bookings=build_booking_details(state)
+    )
+    state["_cached_customer_info"] = (cache_key, customer_info)
+    return customer_info
+
+# Each handler records the events/messages for one run item into the turn dict
+# ("state", "messages", "events", "next_event_id"). Dispatch is by exact item type.
+
+async def record_message_output(item: MessageOutputItem, turn: Dict[str, Any], timestamp: float):
+    text = ItemHelpers.text_message_output(item)
+    turn["messages"].append(MessageResponse(content=text, agent=item.agent.name))
+    turn["events"].append(AgentEvent(id=turn["next_event_id"](), type="message", agent=item.agent.name, content=text, timestamp=timestamp))
+
+async def record_handoff_output(item: HandoffOutputItem, turn: Dict[str, Any], timestamp: float):
+    await apply_handoff(item.source_agent.name, item.target_agent.name, turn, timestamp)
+
+async def apply_handoff(source_name: str, target_name: str, turn: Dict[str, Any], timestamp: float):
+    """Record a handoff, run its hook and make the target the current agent."""
+    events = turn["events"]
+    next_event_id = turn["next_event_id"]
+    state = turn["state"]
+    events.append(
+        AgentEvent(
+            id=next_event_id(),
+            type="handoff",
+            agent=source_name,
+            content=f"Handoff from {source_name} to {target_name}",
+            metadata={"source_agent": source_name, "target_agent": target_name},
+            timestamp=timestamp
+        )
+    )
+    ho, cb_name = HANDOFFS_BY_ROUTE.get((source_name, target_name), (None, None))
+    if cb_name:
+        events.append(AgentEvent(id=next_event_id(), type="hook_call", agent=target_name, content=f"Calling handoff hook: {cb_name}", timestamp=timestamp))
+        await ho.on_handoff(RunContextWrapper(context=state["context"]))
+        events.append(AgentEvent(id=next_event_id(), type="hook_output", agent=target_name, content=f"Handoff hook {cb_name} completed.", timestamp=timestamp))
+    state["current_agent"] = target_name
+
+UI_TRIGGER_TOOLS = {
+    "display_seat_map": DISPLAY_SEAT_MAP,
+    "display_business_form": DISPLAY_BUSINESS_FORM,
+}
+
+async def record_tool_call(item: ToolCallItem, turn: Dict[str, Any], timestamp: float):
+    tool_name = getattr(item.raw_item, "name", "")
+    tool_args = getattr(item.raw_item, "arguments", {})
+    turn["events"].append(
+        AgentEvent(
+            id=turn["next_event_id"](),
+            type="tool_call",
+            agent=item.agent.name,
+            content=f"Calling tool: {tool_name}",
+            metadata={"tool_name": tool_name, "tool_args": tool_args},
+            timestamp=timestamp
+        )
+    )
+    ui_trigger = UI_TRIGGER_TOOLS.get(tool_name)
+    if ui_trigger:
+        turn["messages"].append(MessageResponse(content=ui_trigger, agent=item.agent.name))
+
+async def record_tool_call_output(item: ToolCallOutputItem, turn: Dict[str, Any], timestamp: float):
+    tool_name_for_log = "UNKNOWN_TOOL"
+    if hasattr(item, 'tool_call') and item.tool_call is not None and \
+       hasattr(item.tool_call, 'function') and item.tool_call.function is not None and \
+       hasattr(item.tool_call.function, 'name'):
+        tool_name_for_log = item.tool_call.function.name
+
+    turn["events"].append(
+        AgentEvent(
+            id=turn["next_event_id"](),
+            type="tool_output",
+            agent=item.agent.name,
+            content=f"Tool '{tool_name_for_log}' output: {str(item.output)}",
+            metadata={"tool_result": str(item.output), "tool_name": tool_name_for_log},
+            timestamp=timestamp
+        )
+    )
+
+RUN_ITEM_HANDLERS = {
+    MessageOutputItem: record_message_output,
+    HandoffOutputItem: record_handoff_output,
+    ToolCallItem: record_tool_call,
+    ToolCallOutputItem: record_tool_call_output,
+}
+
+@app.get("/health/db")
+async def db_health():
+    stats = db_client.pool_stats()
+    if not db_client.db_url:
+        return {"healthy": None, "pool": stats}
+    healthy = await db_client.health_check()
+    return ORJSONResponse({"healthy": healthy, "pool": db_client.pool_stats()}, status_code=200 if healthy else 503)
 
 @app.get("/user/{registration_id}", response_model=Dict[str, Any])
 async def get_user(registration_id: str):
@@ -234,10 +588,67 @@ async def get_user(registration_id: str):
         logger.error(f"Error fetching user {registration_id}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+def conversation_lock(req: ChatRequest):
+    if not req.conversation_id:
+        return nullcontext()
+    return conversation_store.acquire(req.conversation_id)
+
+SSE_EVENT_NAMES = {
+    AgentEvent: "agent_event",
+    MessageResponse: "message",
+    ChatResponse: "response",
+}
+
+# Events that can be streamed before the input guardrails finish: they only report routing.
+EARLY_EVENT_TYPES = frozenset({"handoff", "hook_call", "hook_output"})
+
+def format_sse(chunk: BaseModel) -> str:
+    return f"event: {SSE_EVENT_NAMES[type(chunk)]}\ndata: {chunk.model_dump_json()}\n\n"
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat_endpoint(req: ChatRequest):
+    async with conversation_lock(req):
+        response = await handle_chat(req)
+    # ChatResponse is already validated; returning a Response skips FastAPI's second
+    # validate-and-encode pass and serializes once in pydantic-core.
+    return Response(content=response.model_dump_json(), media_type="application/json")
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(req: ChatRequest):
+    """Server-Sent Events variant of /chat: events and messages are sent as the agent produces them,
+    followed by a final `response` event carrying the same payload /chat returns."""
+    async def event_stream():
+        async with conversation_lock(req):
+            try:
+                async for chunk in run_chat_turn(req):
+                    yield format_sse(chunk)
+            except HTTPException as e:
+                yield f"event: error\ndata: {orjson.dumps({'detail': e.detail}).decode()}\n\n"
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+async def handle_chat(req: ChatRequest) -> ChatResponse:
+    response = None
+    async for chunk in run_chat_turn(req):
+        if isinstance(chunk, ChatResponse):
+            response = chunk
+    return response
+
+async def run_chat_turn(req: ChatRequest) -> AsyncIterator[Union[AgentEvent, MessageResponse, ChatResponse]]:
+    """Run one conversation turn, yielding events and messages as they occur and the ChatResponse last."""
+    # Event ids only need to be unique, so draw one random prefix per request and count from it.
+    request_id = uuid4().hex
+    event_counter = itertools.count()
+    def next_event_id() -> str:
+        return f"{request_id}-{next(event_counter)}"
+    # One wall-clock read per request; later timestamps are offsets from the monotonic clock.
+    request_start_ms = time.time() * 1000
+    request_start_perf = time.perf_counter()
+    def now_ms() -> float:
+        return request_start_ms + (time.perf_counter() - request_start_perf) * 1000
+
     conversation_id: str = req.conversation_id or uuid4().hex
     current_agent_name: str = triage_agent.name
+    turn_start_agent_name: Optional[str] = None
     state: Dict[str, Any] = {
         "input_items": [],
         "context": create_initial_context(),
@@ -257,167 +668,156 @@ async def chat_endpoint(req: ChatRequest):
             conversation_id = uuid4().hex
             
             if req.registration_id:
-                state["context"] = await load_user_context(req.registration_id)
+                state["context"] = await cached_load_user_context(req.registration_id)
                 logger.info(f"New conversation {conversation_id}. Loaded user context for registration_id: {req.registration_id}")
             else:
                 state["context"] = create_initial_context()
                 logger.info(f"New conversation {conversation_id}. Created initial context.")
             
-            customer_info_response = None
-            if state["context"].registration_id:
-                customer_info_response = CustomerInfoResponse(
-                    customer=CustomerDetails(
-                        name=state["context"].passenger_name,
-                        account_number=state["context"].account_number,
-                        email=state["context"].customer_email,
-                        is_conference_attendee=state["context"].is_conference_attendee,
-                        conference_name=state["context"].conference_name,
-                        registration_id=state["context"].registration_id,
-                    ),
-                    bookings=[BookingDetails(**b) for b in state["context"].customer_bookings] if state["context"].customer_bookings else []
-                )
+            customer_info_response = build_customer_info(state)
 
             if not req.message.strip():
-                await conversation_store.save(conversation_id, state)
-                return ChatResponse(
+                yield ChatResponse(
                     conversation_id=conversation_id,
                     current_agent=state["current_agent"],
                     messages=[],
-                    events=[AgentEvent(id=uuid4().hex, type="info", agent="System", content="Conversation started.")],
+                    events=[AgentEvent(id=next_event_id(), type="info", agent="System", content="Conversation started.")],
                     context=state["context"].model_dump(),
                     agents=build_agents_list(),
                     guardrails=[],
                     customer_info=customer_info_response,
                 )
+                return
 
         current_agent = get_agent_by_name(state["current_agent"])
-        current_agent_name = current_agent.name
+        current_agent_name = turn_start_agent_name = current_agent.name
+        opening_message = not state["input_items"]
         
         state["input_items"].append({"content": req.message, "role": "user"})
         
-        old_context_dict = state["context"].model_dump().copy()
+        old_context_fields = snapshot_context_fields(state["context"])
         messages: List[MessageResponse] = []
         events: List[AgentEvent] = []
-
-        logger.debug(f"Running agent: {current_agent.name}, with input: '{req.message}'")
-        
-        result = await Runner.run(
-            current_agent,
-            state["input_items"],
-            context=state["context"] 
-        )
-
-        for item in result.new_items:
-            current_time_ms = time.time() * 1000
-            if isinstance(item, MessageOutputItem):
-                text = ItemHelpers.text_message_output(item)
-                messages.append(MessageResponse(content=text, agent=item.agent.name))
-                events.append(AgentEvent(id=uuid4().hex, type="message", agent=item.agent.name, content=text, timestamp=current_time_ms))
-            elif isinstance(item, HandoffOutputItem):
-                events.append(
-                    AgentEvent(
-                        id=uuid4().hex,
-                        type="handoff",
-                        agent=item.source_agent.name,
-                        content=f"Handoff from {item.source_agent.name} to {item.target_agent.name}",
-                        metadata={"source_agent": item.source_agent.name, "target_agent": item.target_agent.name},
-                        timestamp=current_time_ms
-                    )
-                )
-                ho = next((h for h in getattr(item.source_agent, "handoffs", []) if getattr(h, "agent", None) == item.target_agent), None)
-                if ho and ho.on_handoff:
-                    cb_name = getattr(ho.on_handoff, "__name__", repr(ho.on_handoff))
-                    events.append(AgentEvent(id=uuid4().hex, type="hook_call", agent=item.target_agent.name, content=f"Calling handoff hook: {cb_name}", timestamp=current_time_ms))
-                    await ho.on_handoff(RunContextWrapper(context=state["context"]))
-                    events.append(AgentEvent(id=uuid4().hex, type="hook_output", agent=item.target_agent.name, content=f"Handoff hook {cb_name} completed.", timestamp=current_time_ms))
-                current_agent = item.target_agent
-                state["current_agent"] = current_agent.name
-            elif isinstance(item, ToolCallItem):
-                tool_name = getattr(item.raw_item, "name", "")
-                tool_args = getattr(item.raw_item, "arguments", {})
-                events.append(
-                    AgentEvent(
-                        id=uuid4().hex,
-                        type="tool_call",
-                        agent=item.agent.name,
-                        content=f"Calling tool: {tool_name}",
-                        metadata={"tool_name": tool_name, "tool_args": tool_args},
-                        timestamp=current_time_ms
-                    )
-                )
-                if tool_name == "display_seat_map":
-                    messages.append(MessageResponse(content="DISPLAY_SEAT_MAP", agent=item.agent.name))
-                elif tool_name == "display_business_form":
-                    messages.append(MessageResponse(content="DISPLAY_BUSINESS_FORM", agent=item.agent.name))
-            elif isinstance(item, ToolCallOutputItem):
-                tool_name_for_log = "UNKNOWN_TOOL"
-                if hasattr(item, 'tool_call') and item.tool_call is not None and \
-                   hasattr(item.tool_call, 'function') and item.tool_call.function is not None and \
-                   hasattr(item.tool_call.function, 'name'):
-                    tool_name_for_log = item.tool_call.function.name
-
-                events.append(
-                    AgentEvent(
-                        id=uuid4().hex,
-                        type="tool_output",
-                        agent=item.agent.name,
-                        content=f"Tool '{tool_name_for_log}' output: {str(item.output)}",
-                        metadata={"tool_result": str(item.output), "tool_name": tool_name_for_log},
-                        timestamp=current_time_ms
-                    )
-                )
+        turn = {"state": state, "messages": messages, "events": events, "next_event_id": next_event_id}
+
+        if current_agent is triage_agent:
+            shortcut_agent = match_triage_shortcut(req.message)
+            if shortcut_agent is not None:
+                logger.debug(f"Routing directly to {shortcut_agent.name} by keyword.")
+                await apply_handoff(current_agent.name, shortcut_agent.name, turn, now_ms())
+                current_agent = shortcut_agent
+                current_agent_name = shortcut_agent.name
+                for event in events:
+                    yield event
+
+        # Replies that need no model run: fixed templates first, then the reply cache. They skip the
+        # input guardrails, so a message matching a known jailbreak pattern or hint always takes the
+        # model path, where the guardrail trips or the jailbreak model decides.
+        direct_reply, reply_source = None, None
+        direct_reply_allowed = not (JAILBREAK_PATTERNS.search(req.message) or JAILBREAK_HINTS.search(req.message))
+        if direct_reply_allowed and current_agent is schedule_agent:
+            direct_reply, reply_source = answer_attendance_query(req.message, state["context"]), "template"
+        if direct_reply is None and direct_reply_allowed and opening_message:
+            direct_reply, reply_source = get_cached_reply(current_agent.name, req.message), "cache"
+        if direct_reply is not None:
+            logger.debug(f"Answering from the {reply_source} for agent {current_agent.name}.")
+            messages.append(MessageResponse(content=direct_reply, agent=current_agent.name))
+            events.append(AgentEvent(id=next_event_id(), type="message", agent=current_agent.name, content=direct_reply, metadata={"source": reply_source}, timestamp=now_ms()))
+            yield messages[-1]
+            yield events[-1]
+            state["input_items"].append({"role": "assistant", "content": direct_reply})
+        else:
+            logger.debug(f"Running agent: {current_agent.name}, with input: '{req.message}'")
         
-        new_context_dict = state["context"].model_dump()
-        changes = {k: new_context_dict[k] for k in new_context_dict if old_context_dict.get(k) != new_context_dict[k]}
+            result = Runner.run_streamed(
+                current_agent,
+                state["input_items"],
+                context=state["context"],
+                run_config=RUN_CONFIG,
+            )
+            # The input guardrails run alongside the first model call. Until all of them have passed,
+            # only handoff events go out; anything the agent says or calls is held back, so a tripped
+            # turn never shows the answer it is about to refuse.
+            guardrail_count = len(current_agent.input_guardrails) + len(RUN_CONFIG.input_guardrails or [])
+            held: List[Union[AgentEvent, MessageResponse]] = []
+
+            async for stream_event in result.stream_events():
+                if stream_event.type != "run_item_stream_event":
+                    continue
+                item = stream_event.item
+                emitted_messages, emitted_events = len(messages), len(events)
+                current_time_ms = now_ms()
+                handler = RUN_ITEM_HANDLERS.get(type(item))
+                if handler:
+                    await handler(item, turn, current_time_ms)
+                if state["current_agent"] != current_agent.name:
+                    current_agent = get_agent_by_name(state["current_agent"])
+                held.extend(messages[emitted_messages:])
+                held.extend(events[emitted_events:])
+                if len(result.input_guardrail_results) < guardrail_count:
+                    while held and isinstance(held[0], AgentEvent) and held[0].type in EARLY_EVENT_TYPES:
+                        yield held.pop(0)
+                    continue
+                for chunk in held:
+                    yield chunk
+                held.clear()
+            # The stream only ends normally once every guardrail has passed.
+            for chunk in held:
+                yield chunk
+
+            # Extend the history in place with this turn's items instead of rebuilding it via to_input_list().
+            state["input_items"].extend(item.to_input_item() for item in result.new_items)
+
+        # Diffed on both paths: a keyword handoff's hook can change the context even when no model ran.
+        changes = {k: v for k, v in state["context"].__dict__.items() if old_context_fields.get(k) != v}
         if changes:
+            state["_ctx_version"] = state.get("_ctx_version", 0) + 1
             events.append(
                 AgentEvent(
-                    id=uuid4().hex,
+                    id=next_event_id(),
                     type="context_update",
                     agent=current_agent.name,
                     content=f"Context updated: {', '.join(changes.keys())}",
                     metadata={"changes": changes},
-                    timestamp=time.time() * 1000
+                    timestamp=now_ms()
                 )
             )
-
-        state["input_items"] = result.to_input_list()
+            yield events[-1]
+
+        # Only a self-contained answer is reused: same agent throughout, one message, no context change.
+        if (
+            direct_reply is None
+            and opening_message
+            and current_agent_name in REPLY_CACHE_AGENTS
+            and current_agent.name == current_agent_name
+            and not changes
+            and len(messages) == 1
+        ):
+            cache_reply(current_agent_name, req.message, messages[0].content)
         state["current_agent"] = current_agent.name
 
-        logger.debug(f"Attempting to save conversation {conversation_id} state.")
-        await conversation_store.save(conversation_id, state)
-        logger.debug(f"Conversation {conversation_id} state successfully saved.")
-
         guardrail_checks: List[GuardrailCheck] = []
-        active_agent_for_guardrails = get_agent_by_name(state["current_agent"])
-        for g in getattr(active_agent_for_guardrails, "input_guardrails", []):
+        guardrail_timestamp = now_ms()
+        for guardrail_name in get_guardrail_names(state["current_agent"]):
+            # A direct reply never started a run, so its guardrails were not evaluated.
             guardrail_checks.append(
                 GuardrailCheck(
-                    id=uuid4().hex,
-                    name=get_guardrail_name(g),
+                    id=next_event_id(),
+                    name=guardrail_name,
                     input=req.message,
-                    reasoning="Passed (no tripwire triggered)",
-                    passed=True,
-                    timestamp=time.time() * 1000,
+                    reasoning=f"Skipped ({DIRECT_REPLY_LABELS[reply_source]})" if direct_reply is not None else "Passed (no tripwire triggered)",
+                    passed=direct_reply is None,
+                    evaluated=direct_reply is None,
+                    timestamp=guardrail_timestamp,
                 )
             )
         
-        customer_info_response = None
-        if state["context"].registration_id:
-            customer_info_response = CustomerInfoResponse(
-                customer=CustomerDetails(
-                    name=state["context"].passenger_name,
-                    account_number=state["context"].account_number,
-                    email=state["context"].customer_email,
-                    is_conference_attendee=state["context"].is_conference_attendee,
-                    conference_name=state["context"].conference_name,
-                    registration_id=state["context"].registration_id,
-                ),
-                bookings=[BookingDetails(**b) for b in state["context"].customer_bookings] if state["context"].customer_bookings else []
-            )
+        customer_info_response = build_customer_info(state)
 
+        # Same dump the store persists, rebuilt only when a diff above bumped `_ctx_version`.
+        new_context_dict = dump_context(state)
         logger.debug(f"Returning ChatResponse for conversation {conversation_id}.")
-        return ChatResponse(
+        yield ChatResponse(
             conversation_id=conversation_id,
             current_agent=state["current_agent"],
             messages=messages,
@@ -429,24 +829,29 @@ async def chat_endpoint(req: ChatRequest):
         )
 
     except InputGuardrailTripwireTriggered as e:
+        # The run stopped early, so the context may have changed without a diff being taken.
+        state.pop("_ctx_saved_version", None)
+        # A keyword shortcut switches agents before the guardrails run; a refused turn must not.
+        if turn_start_agent_name:
+            state["current_agent"] = turn_start_agent_name
         logger.warning(f"Guardrail tripped for conversation {conversation_id}: {e.guardrail_result.guardrail.name}")
         failed_guardrail_name = get_guardrail_name(e.guardrail_result.guardrail)
         gr_input = req.message
-        gr_timestamp = time.time() * 1000
+        gr_timestamp = now_ms()
         
         guardrail_checks = []
-        for g in getattr(get_agent_by_name(current_agent_name), "input_guardrails", []):
+        for guardrail_name in get_guardrail_names(current_agent_name):
             reasoning = ""
             passed = True
-            if get_guardrail_name(g) == failed_guardrail_name:
+            if guardrail_name == failed_guardrail_name:
                 reasoning = getattr(e.guardrail_result, "reasoning", "Guardrail tripped.")
                 if not reasoning:
                     reasoning = "Guardrail tripped."
                 passed = False
             guardrail_checks.append(
                 GuardrailCheck(
-                    id=uuid4().hex,
-                    name=get_guardrail_name(g),
+                    id=next_event_id(),
+                    name=guardrail_name,
                     input=gr_input,
                     reasoning=reasoning,
                     passed=passed,
@@ -456,42 +861,31 @@ async def chat_endpoint(req: ChatRequest):
 
         refusal = "I can only assist with airline travel services, conference information, and business networking. Your message was flagged as outside my area of expertise. Please ask about flights, bookings, seat changes, cancellations, conference schedules, or business connections."
         state["input_items"].append({"role": "assistant", "content": refusal})
-        
-        await conversation_store.save(conversation_id, state)
-
-        customer_info_response = None
-        if state["context"].registration_id:
-            customer_info_response = CustomerInfoResponse(
-                customer=CustomerDetails(
-                    name=state["context"].passenger_name,
-                    account_number=state["context"].account_number,
-                    email=state["context"].customer_email,
-                    is_conference_attendee=state["context"].is_conference_attendee,
-                    conference_name=state["context"].conference_name,
-                    registration_id=state["context"].registration_id,
-                ),
-                bookings=[BookingDetails(**b) for b in state["context"].customer_bookings] if state["context"].customer_bookings else []
-            )
 
-        return ChatResponse(
+        customer_info_response = build_customer_info(state)
+
+        yield ChatResponse(
             conversation_id=conversation_id,
             current_agent=state["current_agent"],
             messages=[MessageResponse(content=refusal, agent=state["current_agent"])],
-            events=[AgentEvent(id=uuid4().hex, type="guardrail_refusal", agent="System", content=refusal, metadata={"guardrail_name": failed_guardrail_name}, timestamp=gr_timestamp)],
+            events=[AgentEvent(id=next_event_id(), type="guardrail_refusal", agent="System", content=refusal, metadata={"guardrail_name": failed_guardrail_name}, timestamp=gr_timestamp)],
             context=state["context"].model_dump(),
             agents=build_agents_list(),
             guardrails=guardrail_checks,
             customer_info=customer_info_response,
         )
     except Exception as e:
-        logger.error(f"Unexpected error in chat_endpoint for conversation {conversation_id}: {str(e)}", exc_info=True)
+        state.pop("_ctx_saved_version", None)
+        logger.error(f"Unexpected error in run_chat_turn for conversation {conversation_id}: {str(e)}", exc_info=True)
+        error_message_for_user = "An unexpected internal error occurred. Please try again or contact support."
+        if not isinstance(state.get("input_items"), list):
+            state["input_items"] = []
+        state["input_items"].append({"role": "assistant", "content": error_message_for_user})
+        raise HTTPException(status_code=500, detail="Internal server error. Please try again later.")
+    finally:
+        # Single persistence point for every branch: success, guardrail refusal and errors.
         try:
-            error_message_for_user = "An unexpected internal error occurred. Please try again or contact support."
-            if not isinstance(state.get("input_items"), list):
-                state["input_items"] = []
-            state["input_items"].append({"role": "assistant", "content": error_message_for_user})
+            logger.debug(f"Attempting to save conversation {conversation_id} state.")
             await conversation_store.save(conversation_id, state)
         except Exception as save_e:
-            logger.error(f"Failed to save state after unexpected error: {save_e}", exc_info=True)
-            
-        raise HTTPException(status_code=500, detail="Internal server error. Please try again later.")
\ No newline at end of file
+            logger.error(f"Failed to save conversation {conversation_id} state: {save_e}", exc_info=True)
\ No newline at end of file
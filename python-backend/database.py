@@ -1,12 +1,179 @@
 import os
-from supabase import create_client, Client
-from typing import Optional, Dict, Any, List
+import asyncio
+from decimal import Decimal
+from uuid import UUID
+import asyncpg
+import orjson
+import httpx
+import redis.asyncio as aioredis
+from supabase import create_client, Client, ClientOptions
+from typing import Optional, Dict, Any, List, Callable, Awaitable
 import logging
-from datetime import datetime, date
+import time as _time
+from collections import OrderedDict
+from datetime import datetime, date, time
 
 logger = logging.getLogger(__name__)
 
+# Column projections for the rows the app actually reads. flights and
+# conference_schedules stay unprojected: their display columns are optional
+# and read with defaults, so naming them could fail on schemas that lack them.
+USER_COLUMNS = "id,organization_id,details"
+CUSTOMER_COLUMNS = "id,name,email,account_number,is_conference_attendee,conference_name"
+BOOKING_COLUMNS = "id,confirmation_number,seat_number,booking_status,customer_id,flight_id"
+CONVERSATION_COLUMNS = "session_id,history,context,current_agent"
+# Business listings only need the owner's display name, not the whole users row.
+BUSINESS_COLUMNS = "id,user_id,organization_id,details,is_active"
+BUSINESS_WITH_OWNER_COLUMNS = f"{BUSINESS_COLUMNS}, users!inner(id, user_name:details->>user_name)"
+
+def _qualified(columns: str, alias: str) -> str:
+    return ", ".join(f"{alias}.{column}" for column in columns.split(","))
+
+def _to_json_value(value: Any) -> Any:
+    """Convert an asyncpg value to the JSON shape PostgREST would have returned."""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+def _record_to_dict(record: Optional[asyncpg.Record]) -> Optional[Dict[str, Any]]:
+    if record is None:
+        return None
+    return {key: _to_json_value(value) for key, value in record.items()}
+
+async def _init_connection(con: asyncpg.Connection):
+    for type_name in ("json", "jsonb"):
+        await con.set_type_codec(
+            type_name,
+            encoder=lambda value: orjson.dumps(value).decode(),
+            decoder=orjson.loads,
+            schema="pg_catalog",
+        )
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    """Wall-clock datetime of an ISO timestamp as PostgREST returns it, or None."""
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+SCHEDULE_PAGE_SIZE = 500
+
+def _contains_pattern(text: str) -> str:
+    """ILIKE pattern matching `text` anywhere, with its own LIKE wildcards taken literally."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+SCHEDULE_TEXT_COLUMNS = ("speaker_name", "topic", "conference_room_name", "track_name")
+
+class ScheduleSnapshot:
+    """The whole conference schedule, with the lowercased text and parsed times the filters compare against.
+
+    Built once per refresh, so a query is a scan over precomputed values instead of a database round-trip.
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+        self._entries = [
+            (
+                row,
+                {column: (row.get(column) or "").lower() for column in SCHEDULE_TEXT_COLUMNS},
+                str(row.get("conference_date") or "")[:10],
+                _parse_timestamp(row.get("start_time")),
+                _parse_timestamp(row.get("end_time")),
+            )
+            for row in rows
+        ]
+        self.dimensions = {
+            "speakers": sorted({row["speaker_name"] for row in rows if row.get("speaker_name")}),
+            "tracks": sorted({row["track_name"] for row in rows if row.get("track_name")}),
+            "rooms": sorted({row["conference_room_name"] for row in rows if row.get("conference_room_name")}),
+        }
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def filter(
+        self,
+        text_filters: Dict[str, str],
+        conference_date: Optional[date],
+        time_range_start: Optional[time],
+        time_range_end: Optional[time],
+    ) -> List[Dict[str, Any]]:
+        needles = [(column, value.lower()) for column, value in text_filters.items()]
+        day = conference_date.isoformat() if conference_date else None
+        matches = []
+        for row, text, row_day, start, end in self._entries:
+            if day is not None and row_day != day:
+                continue
+            if any(needle not in text[column] for column, needle in needles):
+                continue
+            if time_range_start is not None and (start is None or start.time() < time_range_start):
+                continue
+            if time_range_end is not None and (end is None or end.time() > time_range_end):
+                continue
+            matches.append(row)
+        return matches
+
+class TTLCache:
+    """Small in-process LRU whose entries expire after `ttl` seconds. Cached values are shared; treat them as read-only."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+
+    def get(self, key: Any) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= _time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: Any, value: Any):
+        self._data[key] = (_time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Any):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+def _build_http_client() -> httpx.Client:
+    """One keep-alive HTTP/2 connection pool shared by every PostgREST request.
+
+    PostgREST's create_session sets base_url and headers on the client it is handed, and the
+    storage and functions sub-clients would do the same to it. Only ever use it for `.table()`
+    queries: SupabaseClient never touches `.storage` or `.functions`, and must not start to.
+    (Auth also receives it from ClientOptions but only sends absolute URLs, leaving it untouched.)
+    """
+    return httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+        timeout=10,
+    )
+
 class SupabaseClient:
+    _instance: Optional["SupabaseClient"] = None
+
+    @classmethod
+    def get(cls) -> "SupabaseClient":
+        """Return the process-wide client, creating it on first use."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
     def __init__(self):
         url = os.getenv("SUPABASE_URL")
         key = os.getenv("SUPABASE_ANON_KEY")
@@ -14,22 +181,180 @@ class SupabaseClient:
         if not url or not key:
             raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY must be set in environment variables.")
         
-        self.supabase: Client = create_client(url, key)
+        # ClientOptions.httpx_client needs supabase>=2.16 (pinned in requirements.txt).
+        self.http_client = _build_http_client()
+        self.supabase: Client = create_client(url, key, options=ClientOptions(httpx_client=self.http_client))
         logger.info("Supabase client initialized.")
+
+        # Optional direct Postgres connection (Supabase pooler URL) for the hot read paths.
+        self.db_url = os.getenv("SUPABASE_DB_URL")
+        self._pool: Optional[asyncpg.Pool] = None
+        self._pool_lock = asyncio.Lock()
+        self.pool_queries = 0
+
+        # Optional Redis read-through cache for reference data that only changes between conferences.
+        redis_url = os.getenv("REDIS_URL")
+        self.redis: Optional[aioredis.Redis] = aioredis.from_url(redis_url) if redis_url else None
+        self.reference_cache_ttl = int(os.getenv("REFERENCE_CACHE_TTL", "600"))
+        self.conversation_cache_ttl = int(os.getenv("CONVERSATION_CACHE_TTL", "3600"))
+
+        # Organizations and roles change rarely; keep them in process memory for a few minutes.
+        directory_ttl = float(os.getenv("DIRECTORY_CACHE_TTL", "300"))
+        self._organization_cache = TTLCache(maxsize=1024, ttl=directory_ttl)
+        self._user_role_cache = TTLCache(maxsize=1024, ttl=directory_ttl)
+
+        # Hot tool lookups: bookings for a few seconds, flight status (which this app never writes)
+        # for half a minute, the schedule snapshot (and the speaker/track/room lists derived from it)
+        # for as long as Redis keeps it. Concurrent misses share one query.
+        lookup_ttl = float(os.getenv("LOOKUP_CACHE_TTL", "5"))
+        self._flight_cache = TTLCache(maxsize=1024, ttl=float(os.getenv("FLIGHT_STATUS_CACHE_TTL", "30")))
+        self._booking_cache = TTLCache(maxsize=1024, ttl=lookup_ttl)
+        self._schedule_cache = TTLCache(maxsize=1, ttl=self.reference_cache_ttl)
+        self._inflight: Dict[Any, asyncio.Future] = {}
+        # Bumped by _invalidate so a lookup that started before a write doesn't re-cache its old result.
+        self._generations: Dict[Any, int] = {}
+
+    async def _get_pool(self) -> asyncpg.Pool:
+        if self._pool is None:
+            async with self._pool_lock:
+                if self._pool is None:
+                    # The Supabase pooler is pgbouncer-based, so prepared statements can't be cached.
+                    self._pool = await asyncpg.create_pool(
+                        self.db_url,
+                        min_size=int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+                        max_size=int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+                        statement_cache_size=0,
+                        max_inactive_connection_lifetime=1800,
+                        timeout=30,
+                        server_settings={"jit": "off"},
+                        init=_init_connection,
+                    )
+                    logger.info("Postgres connection pool initialized.")
+        return self._pool
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+        if self.redis is not None:
+            await self.redis.aclose()
+        self.http_client.close()
+
+    async def _cache_get(self, key: str) -> Optional[Any]:
+        if self.redis is None:
+            return None
+        try:
+            cached = await self.redis.get(key)
+            if cached is not None:
+                logger.debug(f"Cache hit for {key}.")
+                return orjson.loads(cached)
+        except Exception as e:
+            logger.warning(f"Error reading {key} from Redis: {e}")
+        return None
+
+    async def _cache_set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        if self.redis is None:
+            return False
+        try:
+            await self.redis.set(key, orjson.dumps(value), ex=ttl or self.reference_cache_ttl)
+            return True
+        except Exception as e:
+            logger.warning(f"Error writing {key} to Redis: {e}")
+            return False
+
+    async def _cached_lookup(self, cache: TTLCache, key: Any, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Serve `key` from `cache`, or run `loader` once for all concurrent callers and cache its result.
+
+        None means "not found / failed" and is not cached; anything else is, including empty
+        results such as a schedule with no sessions.
+        """
+        value = cache.get(key)
+        if value is not None:
+            return value
+        inflight_key = (id(cache), key)
+        generation = self._generations.get(inflight_key, 0)
+        future = self._inflight.get(inflight_key)
+        if future is None:
+            future = asyncio.ensure_future(loader())
+            self._inflight[inflight_key] = future
+            def forget(done: asyncio.Future):
+                # An invalidation may already have replaced this future with a newer lookup.
+                if self._inflight.get(inflight_key) is done:
+                    del self._inflight[inflight_key]
+            future.add_done_callback(forget)
+        value = await asyncio.shield(future)
+        if value is not None and self._generations.get(inflight_key, 0) == generation:
+            cache.set(key, value)
+        return value
+
+    def _invalidate(self, cache: TTLCache, key: Any):
+        """Forget `key` after a write, including any lookup of it still in flight."""
+        inflight_key = (id(cache), key)
+        cache.pop(key)
+        self._inflight.pop(inflight_key, None)
+        self._generations[inflight_key] = self._generations.get(inflight_key, 0) + 1
+
+    async def _execute(self, query):
+        """Run a blocking supabase-py query in a worker thread so it doesn't stall the event loop."""
+        return await asyncio.to_thread(query.execute)
+
+    async def health_check(self) -> bool:
+        """Round-trip a SELECT 1 through the pool."""
+        try:
+            pool = await self._get_pool()
+            async with pool.acquire() as con:
+                return await con.fetchval("SELECT 1") == 1
+        except Exception as e:
+            logger.error(f"Database health check failed: {e}", exc_info=True)
+            return False
+
+    def pool_stats(self) -> Dict[str, Any]:
+        if self._pool is None:
+            return {"configured": bool(self.db_url), "initialized": False}
+        size = self._pool.get_size()
+        idle = self._pool.get_idle_size()
+        return {
+            "configured": True,
+            "initialized": True,
+            "min_size": self._pool.get_min_size(),
+            "max_size": self._pool.get_max_size(),
+            "size": size,
+            "idle": idle,
+            "in_use": size - idle,
+            "total_queries": self.pool_queries,
+        }
+
+    async def _fetchrow(self, query: str, *args) -> Optional[Dict[str, Any]]:
+        pool = await self._get_pool()
+        self.pool_queries += 1
+        async with pool.acquire() as con:
+            return _record_to_dict(await con.fetchrow(query, *args))
+
+    async def _fetch(self, query: str, *args) -> List[Dict[str, Any]]:
+        pool = await self._get_pool()
+        self.pool_queries += 1
+        async with pool.acquire() as con:
+            return [_record_to_dict(record) for record in await con.fetch(query, *args)]
+
     
     async def get_user_by_registration_id(self, registration_id: str) -> Optional[Dict[str, Any]]:
         """Get user details by registration_id from the users table."""
         try:
             logger.debug(f"Querying users table for registration_id: '{registration_id}'")
             
-            response = self.supabase.table("users").select("*").execute()
+            if self.db_url:
+                user = await self._fetchrow(
+                    f"SELECT {USER_COLUMNS} FROM users WHERE details->>'registration_id' = $1 LIMIT 1", str(registration_id)
+                )
+            else:
+                response = await self._execute(self.supabase.table("users").select(USER_COLUMNS).eq(
+                    "details->>registration_id", str(registration_id)
+                ).limit(1))
+                user = response.data[0] if response.data else None
             
-            if response.data:
-                for user in response.data:
-                    details = user.get("details", {})
-                    if isinstance(details, dict) and str(details.get("registration_id")) == str(registration_id):
-                        logger.debug(f"Found user for registration_id: {registration_id}")
-                        return user
+            if user:
+                logger.debug(f"Found user for registration_id: {registration_id}")
+                return user
             
             logger.debug(f"No user found for registration_id: {registration_id}")
             return None
@@ -41,30 +366,86 @@ class SupabaseClient:
         """Get customer details by account number, including conference info."""
         try:
             logger.debug(f"Querying customers table for account_number: '{account_number}'")
-            response = self.supabase.table("customers").select("*").eq("account_number", account_number).execute()
-            logger.debug(f"Supabase response data: {response.data}")
+            if self.db_url:
+                customer = await self._fetchrow(
+                    f"SELECT {CUSTOMER_COLUMNS} FROM customers WHERE account_number = $1 LIMIT 1", account_number
+                )
+            else:
+                response = await self._execute(self.supabase.table("customers").select(CUSTOMER_COLUMNS).eq("account_number", account_number).limit(1))
+                logger.debug(f"Supabase response data: {response.data}")
+                customer = response.data[0] if response.data else None
             
-            if response.data:
+            if customer:
                 logger.debug(f"Found customer for account_number: {account_number}")
-                return response.data[0]
+                return customer
             logger.debug(f"No customer found for account_number: {account_number}")
             return None
         except Exception as e:
             logger.error(f"Error fetching customer with account_number {account_number}: {e}", exc_info=True)
             return None
     
+    async def get_customer_with_bookings(self, account_number: str) -> Optional[Dict[str, Any]]:
+        """Get a customer by account number with their bookings (and flights) embedded, in one round trip."""
+        try:
+            if self.db_url:
+                customer = await self._fetchrow(
+                    f"""
+                    SELECT {_qualified(CUSTOMER_COLUMNS, "c")}, COALESCE((
+                        SELECT jsonb_agg(to_jsonb(b) || jsonb_build_object('flights', to_jsonb(f)))
+                        FROM bookings b
+                        LEFT JOIN flights f ON f.id = b.flight_id
+                        WHERE b.customer_id = c.id
+                    ), '[]'::jsonb) AS bookings
+                    FROM customers c
+                    WHERE c.account_number = $1
+                    LIMIT 1
+                    """,
+                    account_number,
+                )
+            else:
+                response = await self._execute(self.supabase.table("customers").select(
+                    f"{CUSTOMER_COLUMNS}, bookings({BOOKING_COLUMNS}, flights:flight_id(*))"
+                ).eq("account_number", account_number).limit(1))
+                customer = response.data[0] if response.data else None
+
+            if customer:
+                logger.debug(f"Found customer with {len(customer.get('bookings') or [])} bookings for account_number: {account_number}")
+                return customer
+            logger.debug(f"No customer found for account_number: {account_number}")
+            return None
+        except Exception as e:
+            logger.error(f"Error fetching customer with bookings for account_number {account_number}: {e}", exc_info=True)
+            return None
+    
     async def get_booking_by_confirmation(self, confirmation_number: str) -> Optional[Dict[str, Any]]:
         """Get booking details with customer and flight info."""
+        return await self._cached_lookup(
+            self._booking_cache, confirmation_number, lambda: self._load_booking(confirmation_number)
+        )
+
+    async def _load_booking(self, confirmation_number: str) -> Optional[Dict[str, Any]]:
         try:
-            response = self.supabase.table("bookings").select("""
-                *,
-                customers:customer_id(*),
-                flights:flight_id(*)
-            """).eq("confirmation_number", confirmation_number).execute()
+            if self.db_url:
+                booking = await self._fetchrow(
+                    f"""
+                    SELECT {_qualified(BOOKING_COLUMNS, "b")}, to_jsonb(c) AS customers, to_jsonb(f) AS flights
+                    FROM bookings b
+                    LEFT JOIN customers c ON c.id = b.customer_id
+                    LEFT JOIN flights f ON f.id = b.flight_id
+                    WHERE b.confirmation_number = $1
+                    LIMIT 1
+                    """,
+                    confirmation_number,
+                )
+            else:
+                response = await self._execute(self.supabase.table("bookings").select(
+                    f"{BOOKING_COLUMNS}, customers:customer_id({CUSTOMER_COLUMNS}), flights:flight_id(*)"
+                ).eq("confirmation_number", confirmation_number).limit(1))
+                booking = response.data[0] if response.data else None
             
-            if response.data:
+            if booking:
                 logger.debug(f"Found booking for confirmation_number: {confirmation_number}")
-                return response.data[0]
+                return booking
             logger.debug(f"No booking found for confirmation_number: {confirmation_number}")
             return None
         except Exception as e:
@@ -73,11 +454,20 @@ class SupabaseClient:
     
     async def get_flight_status(self, flight_number: str) -> Optional[Dict[str, Any]]:
         """Get flight status information."""
+        return await self._cached_lookup(self._flight_cache, flight_number, lambda: self._load_flight_status(flight_number))
+
+    async def _load_flight_status(self, flight_number: str) -> Optional[Dict[str, Any]]:
         try:
-            response = self.supabase.table("flights").select("*").eq("flight_number", flight_number).execute()
-            if response.data:
+            if self.db_url:
+                flight = await self._fetchrow(
+                    "SELECT * FROM flights WHERE flight_number = $1 LIMIT 1", flight_number
+                )
+            else:
+                response = await self._execute(self.supabase.table("flights").select("*").eq("flight_number", flight_number).limit(1))
+                flight = response.data[0] if response.data else None
+            if flight:
                 logger.debug(f"Found flight status for flight_number: {flight_number}")
-                return response.data[0]
+                return flight
             logger.debug(f"No flight status found for flight_number: {flight_number}")
             return None
         except Exception as e:
@@ -87,11 +477,12 @@ class SupabaseClient:
     async def update_seat_number(self, confirmation_number: str, new_seat: str) -> bool:
         """Update seat number for a booking."""
         try:
-            response = self.supabase.table("bookings").update({
+            response = await self._execute(self.supabase.table("bookings").update({
                 "seat_number": new_seat
-            }).eq("confirmation_number", confirmation_number).execute()
+            }).eq("confirmation_number", confirmation_number))
             
             updated = len(response.data) > 0
+            self._invalidate(self._booking_cache, confirmation_number)
             if updated:
                 logger.info(f"Successfully updated seat to {new_seat} for confirmation {confirmation_number}.")
             else:
@@ -104,11 +495,12 @@ class SupabaseClient:
     async def cancel_booking(self, confirmation_number: str) -> bool:
         """Cancel a booking by setting its status to 'Cancelled'."""
         try:
-            response = self.supabase.table("bookings").update({
+            response = await self._execute(self.supabase.table("bookings").update({
                 "booking_status": "Cancelled"
-            }).eq("confirmation_number", confirmation_number).execute()
+            }).eq("confirmation_number", confirmation_number))
             
             cancelled = len(response.data) > 0
+            self._invalidate(self._booking_cache, confirmation_number)
             if cancelled:
                 logger.info(f"Successfully cancelled booking with confirmation {confirmation_number}.")
             else:
@@ -121,10 +513,10 @@ class SupabaseClient:
     async def get_bookings_by_customer_id(self, customer_id: str) -> List[Dict[str, Any]]:
         """Get all bookings for a customer by their customer_id."""
         try:
-            response = self.supabase.table("bookings").select("""
+            response = await self._execute(self.supabase.table("bookings").select("""
                 *,
                 flights:flight_id(*)
-            """).eq("customer_id", customer_id).execute() 
+            """).eq("customer_id", customer_id)) 
 
             if response.data:
                 logger.debug(f"Found {len(response.data)} bookings for customer_id: {customer_id}")
@@ -142,86 +534,105 @@ class SupabaseClient:
         conference_room_name: Optional[str] = None,
         track_name: Optional[str] = None,
         conference_date: Optional[date] = None,
-        time_range_start: Optional[datetime] = None,
-        time_range_end: Optional[datetime] = None
+        time_range_start: Optional[time] = None,
+        time_range_end: Optional[time] = None
     ) -> List[Dict[str, Any]]:
-        """Fetches conference schedule based on various filters."""
+        """Fetches conference schedule based on various filters.
+
+        Filters run against an in-memory snapshot of the whole schedule. Text filters are
+        case-insensitive substring matches. Time bounds are times of day; with a date they
+        apply to that date, without one they match sessions on any day.
+        """
         try:
-            query = self.supabase.table("conference_schedules").select("*")
-
-            if speaker_name:
-                query = query.ilike("speaker_name", f"%{speaker_name}%")
-            if topic:
-                query = query.ilike("topic", f"%{topic}%")
-            if conference_room_name:
-                query = query.ilike("conference_room_name", f"%{conference_room_name}%")
-            if track_name:
-                query = query.ilike("track_name", f"%{track_name}%")
-            if conference_date:
-                query = query.eq("conference_date", conference_date.isoformat())
-            if time_range_start:
-                query = query.gte("start_time", time_range_start.isoformat())
-            if time_range_end:
-                query = query.lte("end_time", time_range_end.isoformat())
-
-            response = query.order("start_time").execute()
+            snapshot = await self._cached_lookup(self._schedule_cache, "all", self._load_schedule_snapshot)
+            if snapshot is None:
+                return []
+            text_filters = {
+                column: value
+                for column, value in (
+                    ("speaker_name", speaker_name),
+                    ("topic", topic),
+                    ("conference_room_name", conference_room_name),
+                    ("track_name", track_name),
+                )
+                if value
+            }
+            sessions = snapshot.filter(text_filters, conference_date, time_range_start, time_range_end)
             
-            if response.data:
-                logger.debug(f"Found {len(response.data)} conference sessions.")
+            if sessions:
+                logger.debug(f"Found {len(sessions)} conference sessions.")
             else:
                 logger.debug("No conference sessions found for the given criteria.")
-            return response.data or []
+            return sessions
         except Exception as e:
             logger.error(f"Error fetching conference schedule: {e}", exc_info=True)
             return []
 
-    async def get_all_speakers(self) -> List[str]:
-        """Get all unique speakers from conference_schedules."""
+    async def _load_schedule_snapshot(self) -> Optional["ScheduleSnapshot"]:
         try:
-            response = self.supabase.table("conference_schedules").select("speaker_name").execute()
-            if response.data:
-                speakers = list(set([item["speaker_name"] for item in response.data]))
-                speakers.sort()
-                logger.debug(f"Found {len(speakers)} unique speakers.")
-                return speakers
-            return []
+            rows = await self._cache_get("conference:schedule")
+            if rows is None:
+                if self.db_url:
+                    rows = await self._fetch("SELECT * FROM conference_schedules ORDER BY start_time, id")
+                else:
+                    rows = await self._fetch_all_schedule_rows()
+                await self._cache_set("conference:schedule", rows)
+            logger.debug(f"Loaded {len(rows)} conference sessions into the schedule snapshot.")
+            return ScheduleSnapshot(rows)
         except Exception as e:
-            logger.error(f"Error fetching speakers: {e}", exc_info=True)
-            return []
+            logger.error(f"Error loading conference schedule: {e}", exc_info=True)
+            return None
+
+    async def _fetch_all_schedule_rows(self) -> List[Dict[str, Any]]:
+        """Read the whole schedule through PostgREST in pages, since the server caps rows per response.
+
+        A page can come back shorter than asked when that cap is lower than SCHEDULE_PAGE_SIZE, so
+        only an empty page ends the scan. id breaks start_time ties to keep the pages stable.
+        """
+        rows: List[Dict[str, Any]] = []
+        while True:
+            response = await self._execute(
+                self.supabase.table("conference_schedules").select("*").order("start_time").order("id")
+                .range(len(rows), len(rows) + SCHEDULE_PAGE_SIZE - 1)
+            )
+            page = response.data or []
+            if not page:
+                return rows
+            rows.extend(page)
+
+    async def invalidate_schedule(self):
+        """Drop the cached schedule and the lists derived from it, e.g. after editing conference_schedules."""
+        self._schedule_cache.clear()
+        if self.redis is not None:
+            try:
+                await self.redis.delete("conference:schedule")
+            except Exception as e:
+                logger.warning(f"Error clearing schedule keys from Redis: {e}")
+
+    async def get_conference_dimensions(self) -> Dict[str, List[str]]:
+        """Distinct speakers, tracks and rooms, all derived from the one schedule snapshot."""
+        snapshot = await self._cached_lookup(self._schedule_cache, "all", self._load_schedule_snapshot)
+        if snapshot is None:
+            return {"speakers": [], "tracks": [], "rooms": []}
+        return snapshot.dimensions
+
+    async def get_all_speakers(self) -> List[str]:
+        """Get all unique speakers from conference_schedules."""
+        return (await self.get_conference_dimensions())["speakers"]
 
     async def get_all_tracks(self) -> List[str]:
         """Get all unique tracks from conference_schedules."""
-        try:
-            response = self.supabase.table("conference_schedules").select("track_name").execute()
-            if response.data:
-                tracks = list(set([item["track_name"] for item in response.data]))
-                tracks.sort()
-                logger.debug(f"Found {len(tracks)} unique tracks.")
-                return tracks
-            return []
-        except Exception as e:
-            logger.error(f"Error fetching tracks: {e}", exc_info=True)
-            return []
+        return (await self.get_conference_dimensions())["tracks"]
 
     async def get_all_rooms(self) -> List[str]:
         """Get all unique rooms from conference_schedules."""
-        try:
-            response = self.supabase.table("conference_schedules").select("conference_room_name").execute()
-            if response.data:
-                rooms = list(set([item["conference_room_name"] for item in response.data]))
-                rooms.sort()
-                logger.debug(f"Found {len(rooms)} unique rooms.")
-                return rooms
-            return []
-        except Exception as e:
-            logger.error(f"Error fetching rooms: {e}", exc_info=True)
-            return []
+        return (await self.get_conference_dimensions())["rooms"]
 
     # Networking Agent Database Methods
     async def get_user_businesses(self, user_id: str) -> List[Dict[str, Any]]:
         """Get all businesses for a user."""
         try:
-            response = self.supabase.table("ib_businesses").select("*").eq("user_id", user_id).execute()
+            response = await self._execute(self.supabase.table("ib_businesses").select("*").eq("user_id", user_id))
             if response.data:
                 logger.debug(f"Found {len(response.data)} businesses for user_id: {user_id}")
                 return response.data
@@ -233,11 +644,11 @@ class SupabaseClient:
     async def get_all_businesses(self, organization_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get all businesses, optionally filtered by organization."""
         try:
-            query = self.supabase.table("ib_businesses").select("*, users!inner(*)")
+            query = self.supabase.table("ib_businesses").select(BUSINESS_WITH_OWNER_COLUMNS)
             if organization_id:
                 query = query.eq("organization_id", organization_id)
             
-            response = query.execute()
+            response = await self._execute(query)
             if response.data:
                 logger.debug(f"Found {len(response.data)} businesses.")
                 return response.data
@@ -255,42 +666,36 @@ class SupabaseClient:
     ) -> List[Dict[str, Any]]:
         """Search businesses by various criteria."""
         try:
-            response = self.supabase.table("ib_businesses").select("*, users!inner(*)").execute()
-            
-            if not response.data:
-                return []
-            
-            filtered_businesses = []
-            for business in response.data:
-                details = business.get("details", {})
-                if not isinstance(details, dict):
-                    continue
-                
-                match = True
-                if industry_sector and industry_sector.lower() not in details.get("industrySector", "").lower():
-                    match = False
-                if location and location.lower() not in details.get("location", "").lower():
-                    match = False
-                if company_name and company_name.lower() not in details.get("companyName", "").lower():
-                    match = False
-                if sub_sector and sub_sector.lower() not in details.get("subSector", "").lower():
-                    match = False
-                
-                if match:
-                    filtered_businesses.append(business)
+            query = self.supabase.table("ib_businesses").select(BUSINESS_WITH_OWNER_COLUMNS)
+
+            if industry_sector:
+                query = query.ilike("details->>industrySector", _contains_pattern(industry_sector))
+            if location:
+                query = query.ilike("details->>location", _contains_pattern(location))
+            if company_name:
+                query = query.ilike("details->>companyName", _contains_pattern(company_name))
+            if sub_sector:
+                query = query.ilike("details->>subSector", _contains_pattern(sub_sector))
+
+            response = await self._execute(query)
+            businesses = response.data or []
             
-            logger.debug(f"Found {len(filtered_businesses)} matching businesses.")
-            return filtered_businesses
+            logger.debug(f"Found {len(businesses)} matching businesses.")
+            return businesses
         except Exception as e:
             logger.error(f"Error searching businesses: {e}", exc_info=True)
             return []
 
     async def get_organization_info(self, organization_id: str) -> Optional[Dict[str, Any]]:
         """Get organization information."""
+        cached = self._organization_cache.get(organization_id)
+        if cached is not None:
+            return cached
         try:
-            response = self.supabase.table("organizations").select("*").eq("id", organization_id).execute()
+            response = await self._execute(self.supabase.table("organizations").select("*").eq("id", organization_id).limit(1))
             if response.data:
                 logger.debug(f"Found organization for id: {organization_id}")
+                self._organization_cache.set(organization_id, response.data[0])
                 return response.data[0]
             return None
         except Exception as e:
@@ -299,18 +704,32 @@ class SupabaseClient:
 
     async def get_user_role_info(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get user role information."""
+        cached = self._user_role_cache.get(user_id)
+        if cached is not None:
+            return cached
         try:
-            response = self.supabase.table("users").select("*, roles(*)").eq("id", user_id).execute()
+            response = await self._execute(self.supabase.table("users").select("*, roles(*)").eq("id", user_id).limit(1))
             if response.data:
                 logger.debug(f"Found user role info for user_id: {user_id}")
+                self._user_role_cache.set(user_id, response.data[0])
                 return response.data[0]
             return None
         except Exception as e:
             logger.error(f"Error fetching user role info {user_id}: {e}", exc_info=True)
             return None
 
-    async def add_business(self, user_id: str, business_details: Dict[str, Any], organization_id: str) -> bool:
-        """Add a new business for a user."""
+    async def add_business(
+        self,
+        user_id: str,
+        business_details: Dict[str, Any],
+        organization_id: str,
+        idempotency_key: Optional[str] = None
+    ) -> bool:
+        """Add a new business for a user.
+
+        When an idempotency_key is given, a retried insert with the same key is a no-op
+        and the existing row counts as success.
+        """
         try:
             data = {
                 "user_id": user_id,
@@ -319,7 +738,19 @@ class SupabaseClient:
                 "is_active": True
             }
             
-            response = self.supabase.table("ib_businesses").insert(data).execute()
+            if idempotency_key:
+                data["idempotency_key"] = idempotency_key
+                response = await self._execute(
+                    self.supabase.table("ib_businesses").upsert(data, on_conflict="idempotency_key", ignore_duplicates=True)
+                )
+                if not response.data:
+                    response = await self._execute(
+                        self.supabase.table("ib_businesses").select("id").eq("idempotency_key", idempotency_key).limit(1)
+                    )
+                    if response.data:
+                        logger.info(f"Business for user {user_id} already added with key {idempotency_key}.")
+            else:
+                response = await self._execute(self.supabase.table("ib_businesses").insert(data))
             
             success = len(response.data) > 0
             if success:
@@ -334,10 +765,10 @@ class SupabaseClient:
     async def get_customer_bookings(self, account_number: str) -> List[Dict[str, Any]]:
         """Get all bookings for a customer by their account number."""
         try:
-            response = self.supabase.table("bookings").select("""
+            response = await self._execute(self.supabase.table("bookings").select("""
                 *,
                 flights:flight_id(*)
-            """).eq("customers.account_number", account_number).execute()
+            """).eq("customers.account_number", account_number))
             if response.data:
                 logger.debug(f"Found {len(response.data)} bookings for account_number: {account_number}")
             else:
@@ -348,17 +779,25 @@ class SupabaseClient:
             return []
     
     async def save_conversation(self, session_id: str, history: List[Dict], context: Dict, current_agent: str) -> bool:
-        """Save or update conversation state to the 'conversations' table."""
+        """Save conversation state to Redis (when configured) and upsert it to the 'conversations' table.
+
+        Returns whether the table write succeeded: Redis only holds the state for its TTL, so a caller
+        that retries failed saves has to see Postgres failures. Awaiting the upsert also keeps one
+        session's writes in the order they were made.
+        """
+        data = {
+            "session_id": session_id,
+            "history": history,
+            "context": context,
+            "current_agent": current_agent,
+        }
+        await self._cache_set(f"conv:{session_id}", data, ttl=self.conversation_cache_ttl)
+        return await self._upsert_conversation(data)
+
+    async def _upsert_conversation(self, data: Dict[str, Any]) -> bool:
+        session_id = data["session_id"]
         try:
-            data = {
-                "session_id": session_id,
-                "history": history,
-                "context": context,
-                "current_agent": current_agent,
-                "last_updated": "now()"
-            }
-            
-            response = self.supabase.table("conversations").upsert(data).execute()
+            response = await self._execute(self.supabase.table("conversations").upsert({**data, "last_updated": "now()"}))
             
             upserted = len(response.data) > 0
             if upserted:
@@ -371,12 +810,27 @@ class SupabaseClient:
             return False
     
     async def load_conversation(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """Load conversation state from the 'conversations' table."""
+        """Load conversation state from Redis, falling back to the 'conversations' table."""
+        if self.redis is not None:
+            try:
+                # GETEX refreshes the TTL, so active conversations stay cached.
+                cached = await self.redis.getex(f"conv:{session_id}", ex=self.conversation_cache_ttl)
+                if cached is not None:
+                    logger.debug(f"Conversation {session_id} loaded from Redis.")
+                    return orjson.loads(cached)
+            except Exception as e:
+                logger.warning(f"Error reading conversation {session_id} from Redis: {e}")
         try:
-            response = self.supabase.table("conversations").select("*").eq("session_id", session_id).execute()
-            if response.data:
+            if self.db_url:
+                conversation = await self._fetchrow(
+                    f"SELECT {CONVERSATION_COLUMNS} FROM conversations WHERE session_id = $1 LIMIT 1", session_id
+                )
+            else:
+                response = await self._execute(self.supabase.table("conversations").select(CONVERSATION_COLUMNS).eq("session_id", session_id).limit(1))
+                conversation = response.data[0] if response.data else None
+            if conversation:
                 logger.debug(f"Conversation {session_id} successfully loaded.")
-                return response.data[0]
+                return conversation
             logger.debug(f"No conversation found for session_id: {session_id}.")
             return None
         except Exception as e:
@@ -384,4 +838,4 @@ class SupabaseClient:
             return None
 
 # Global instance of SupabaseClient
-db_client = SupabaseClient()
\ No newline at end of file
+db_client = SupabaseClient.get()
\ No newline at end of file
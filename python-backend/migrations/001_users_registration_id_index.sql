@@ -0,0 +1,4 @@
+-- Lets get_user_by_registration_id filter on details->>'registration_id' in Postgres
+-- instead of scanning every row of users.
+CREATE INDEX IF NOT EXISTS users_registration_id_idx
+    ON users ((details->>'registration_id'));
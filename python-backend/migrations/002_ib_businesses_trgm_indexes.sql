@@ -0,0 +1,15 @@
+-- Trigram indexes so the ILIKE '%...%' filters in search_businesses can use an
+-- index instead of scanning every row of ib_businesses.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS ib_businesses_industry_sector_trgm_idx
+    ON ib_businesses USING gin ((details->>'industrySector') gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS ib_businesses_location_trgm_idx
+    ON ib_businesses USING gin ((details->>'location') gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS ib_businesses_company_name_trgm_idx
+    ON ib_businesses USING gin ((details->>'companyName') gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS ib_businesses_sub_sector_trgm_idx
+    ON ib_businesses USING gin ((details->>'subSector') gin_trgm_ops);
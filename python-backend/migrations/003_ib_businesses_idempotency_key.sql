@@ -0,0 +1,6 @@
+-- Client-supplied key so add_business can be retried without inserting the
+-- same business twice. Existing rows keep NULL, which UNIQUE allows.
+ALTER TABLE ib_businesses ADD COLUMN IF NOT EXISTS idempotency_key text;
+
+CREATE UNIQUE INDEX IF NOT EXISTS ib_businesses_idempotency_key_idx
+    ON ib_businesses (idempotency_key);
@@ -0,0 +1,4 @@
+-- Lets the customer lookups by account_number (get_customer_by_account_number,
+-- get_customer_with_bookings) use an index instead of scanning customers.
+CREATE INDEX IF NOT EXISTS customers_account_number_idx
+    ON customers (account_number);
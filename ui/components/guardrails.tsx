@@ -67,7 +67,11 @@ export function Guardrails({ guardrails, inputGuardrails }: GuardrailsProps) {
                 })()}
               </p>
               <div className="flex text-xs">
-                {!gr.input || gr.passed ? (
+                {gr.evaluated === false ? (
+                  <Badge className="mt-2 px-2 py-1 bg-zinc-400 hover:bg-zinc-500 flex items-center text-white">
+                    Skipped
+                  </Badge>
+                ) : !gr.input || gr.passed ? (
                   <Badge className="mt-2 px-2 py-1 bg-emerald-500 hover:bg-emerald-600 flex items-center text-white">
                     <CheckCircle className="h-4 w-4 mr-1 text-white" />
                     Passed
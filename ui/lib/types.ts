@@ -153,6 +153,8 @@ export interface GuardrailCheck {
   reasoning: string
   passed: boolean
   timestamp: Date
+  // false when the backend answered without running the guardrails
+  evaluated?: boolean
 }
 
 // --- New interfaces for Customer Information ---